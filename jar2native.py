@@ -3,14 +3,168 @@
 
 import os
 import sys
+import errno
+import functools
+import hashlib
+import json
+import mmap
+import re
 import subprocess
 import shutil
 import zipfile
 import time
 import argparse
 import tempfile
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional, Set, Tuple
+
+
+CACHE_DIR = Path.home() / ".cache" / "jar2native"
+
+
+def _cache_key(*parts: str) -> str:
+    """Build disk cache key from identifying parts"""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _hash_file(path: str) -> str:
+    """SHA-256 of file contents, hashed from a read-only mmap (no full copy in memory)"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+
+# Linux ioctl request number for FICLONE (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+
+def _mirror_tree(src: Path, dst: Path) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Recreate directories and symlinks of src under dst, return (src, dst) pairs of regular files and directories"""
+    os.makedirs(dst)
+    files, dirs = [], [(str(src), str(dst))]
+    with os.scandir(src) as it:
+        for entry in it:
+            target = os.path.join(dst, entry.name)
+            if entry.is_symlink():
+                os.symlink(os.readlink(entry.path), target)
+            elif entry.is_dir():
+                sub_files, sub_dirs = _mirror_tree(Path(entry.path), Path(target))
+                files.extend(sub_files)
+                dirs.extend(sub_dirs)
+            else:
+                files.append((entry.path, target))
+    return files, dirs
+
+
+def _copy_dir_stats(dirs: List[Tuple[str, str]]):
+    """Copy directory modes and times (like shutil.copytree) once contents are in place, deepest first"""
+    for src_dir, dst_dir in reversed(dirs):
+        shutil.copystat(src_dir, dst_dir)
+
+
+def _clone_file(src: str, dst: str):
+    """Create dst as a copy-on-write clone of src (raises OSError if unsupported)"""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(src, "rb") as src_f, open(dst, "wb") as dst_f:
+            fcntl.ioctl(dst_f.fileno(), FICLONE, src_f.fileno())
+    elif sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), src)
+    else:
+        try:
+            from reflink import reflink
+        except ImportError:
+            raise OSError(errno.EOPNOTSUPP, "Copy-on-write clone not supported", src)
+        try:
+            reflink(src, dst)
+        except Exception as e:
+            raise OSError(errno.EOPNOTSUPP, f"Copy-on-write clone failed: {e}", src)
+    shutil.copystat(src, dst)
+
+
+def _link_tree(src: Path, dst: Path):
+    """Replicate directory tree as hard links to the source files"""
+    files, dirs = _mirror_tree(src, dst)
+    for src_file, dst_file in files:
+        os.link(src_file, dst_file)
+    _copy_dir_stats(dirs)
+
+
+def _clone_tree(src: Path, dst: Path):
+    """Replicate directory tree as copy-on-write clones of the source files"""
+    files, dirs = _mirror_tree(src, dst)
+    for src_file, dst_file in files:
+        _clone_file(src_file, dst_file)
+    _copy_dir_stats(dirs)
+
+
+def _fast_copytree(src: Path, dst: Path):
+    """Replicate directory tree via hard links or CoW clones when on the same filesystem, else copy"""
+    if os.stat(src).st_dev == os.stat(dst.parent).st_dev:
+        for replicate in (_link_tree, _clone_tree):
+            try:
+                replicate(src, dst)
+                return
+            except FileExistsError:
+                raise
+            except OSError:
+                shutil.rmtree(dst, ignore_errors=True)
+    _parallel_copytree(src, dst)
+
+
+def _parallel_copytree(src: Path, dst: Path):
+    """Copy directory tree with file copies fanned out over a thread pool (symlinks preserved)"""
+    files, dirs = _mirror_tree(src, dst)
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        # Consume results so the first copy error propagates
+        for _ in pool.map(lambda pair: shutil.copy2(*pair), files):
+            pass
+    _copy_dir_stats(dirs)
+
+
+def _disk_cache(key: str) -> Optional[str]:
+    """Get cached value for key (None on miss)"""
+    try:
+        return (CACHE_DIR / f"{key}.txt").read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _disk_cache_store(key: str, value: str):
+    """Store value for key (best effort, atomic replace)"""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_DIR / f"{key}.{os.getpid()}.tmp"
+        tmp_path.write_text(value, encoding="utf-8")
+        os.replace(tmp_path, CACHE_DIR / f"{key}.txt")
+    except OSError as e:
+        print(f"[WARN] Failed to write cache: {e}")
+
+
+@functools.lru_cache(maxsize=4)
+def _detect_jdk_cached(path_env: str, java_home: str) -> str:
+    """Detect JDK from java on PATH (memoized per PATH/JAVA_HOME, arguments are the cache key)"""
+    try:
+        out = subprocess.check_output(["java", "-version"], stderr=subprocess.STDOUT)
+        if b'version "1.' in out:
+            raise RuntimeError("JDK version too old (requires 9+)")
+
+        java_path = shutil.which("java", path=path_env or None)
+        if java_path:
+            jdk_path = str(Path(java_path).parent.parent)
+            print(f"[INFO] JDK detected: {jdk_path}")
+            return jdk_path
+    except Exception as e:
+        print(f"[ERROR] JDK detection failed: {e}")
+    return ""
 
 
 class JDKManager:
@@ -20,98 +174,215 @@ class JDKManager:
         self.jdk_dir = custom_path or self._detect_jdk()
         if not self.jdk_dir:
             raise RuntimeError("JDK not found")
+        self._version = None
 
     def _detect_jdk(self) -> str:
-        try:
-            out = subprocess.check_output(["java", "-version"], stderr=subprocess.STDOUT)
-            if b'version "1.' in out:
-                raise RuntimeError("JDK version too old (requires 9+)")
-
-            java_path = shutil.which("java")
-            if java_path:
-                jdk_path = str(Path(java_path).parent.parent)
-                print(f"[INFO] JDK detected: {jdk_path}")
-                return jdk_path
-        except Exception as e:
-            print(f"[ERROR] JDK detection failed: {e}")
-        return ""
+        return _detect_jdk_cached(os.environ.get("PATH", ""), os.environ.get("JAVA_HOME", ""))
 
     def get_bin(self, tool: str) -> Path:
         """Get path to JDK binary tool"""
         return Path(self.jdk_dir) / "bin" / tool
 
+    def version(self) -> str:
+        """Get JDK version string (release file, else jlink --version), probed once per instance"""
+        if self._version is None:
+            try:
+                release = (Path(self.jdk_dir) / "release").read_text(encoding="utf-8", errors="ignore")
+                self._version = next(line.split("=", 1)[1].strip().strip('"') for line in release.splitlines()
+                                     if line.startswith("JAVA_VERSION="))
+            except (OSError, StopIteration):
+                out = subprocess.check_output([str(self.get_bin("jlink")), "--version"])
+                self._version = out.decode("utf-8", "replace").strip()
+        return self._version
+
+    def feature_version(self) -> int:
+        """Get JDK feature release number (e.g. 17 for 17.0.2)"""
+        match = re.match(r"\d+", self.version())
+        return int(match.group()) if match else 0
+
+    def fingerprint(self) -> str:
+        """Identify JDK installation for cache keys (path + release file mtime/size)"""
+        try:
+            st = (Path(self.jdk_dir) / "release").stat()
+            return f"{self.jdk_dir}:{st.st_mtime_ns}:{st.st_size}"
+        except OSError:
+            return self.jdk_dir
+
     def list_all_modules(self) -> str:
         """List all available modules in JDK"""
-        out = subprocess.check_output([str(self.get_bin("java")), "--list-modules"], text=True)
+        # jmods/ holds one <module>.jmod per module, no JVM start needed
+        if jmods := sorted(p.stem for p in (Path(self.jdk_dir) / "jmods").glob("*.jmod")):
+            return ",".join(jmods)
+
+        # No jmods (e.g. custom runtime image): ask java, cached on disk
+        key = _cache_key("list-modules", self.fingerprint())
+        if (cached := _disk_cache(key)) is not None:
+            return cached
+
+        out = subprocess.check_output([str(self.get_bin("java")), "--list-modules"]).decode("utf-8", "replace")
         modules = {line.split("@")[0] for line in out.splitlines() if line.strip()}
-        return ",".join(sorted(modules))
+        result = ",".join(sorted(modules))
+        _disk_cache_store(key, result)
+        return result
 
 
 class ModuleAnalyzer:
     """Module dependency analyzer for JAR/WAR files"""
 
     DEFAULT_MODULES = "java.instrument,java.base,java.logging"
+    COPY_BUFFER_SIZE = 1 << 16
+    PARALLEL_EXTRACT_THRESHOLD = 32 << 20
+    # Part of the analysis cache key: bump whenever target preparation or jdeps options change
+    ANALYSIS_VERSION = 2
+    BRACKETED_RE = re.compile(r"\[([^\]\n]+)\]")
 
     def __init__(self, jdk_manager: JDKManager):
         self.jdk = jdk_manager
 
-    def analyze(self, jar_path: str, use_all: bool = False) -> str:
-        """Analyze required modules from target JAR/WAR"""
+    def analyze(self, jar_path: str, use_all: bool = False, archive: Optional[zipfile.ZipFile] = None) -> str:
+        """Analyze required modules from target JAR/WAR (archive: already opened handle of jar_path)"""
         if use_all:
             print("[INFO] Using all JDK modules")
             return self.jdk.list_all_modules()
 
-        targets = self._prepare_targets(jar_path)
-        return self._run_jdeps(targets)
-
-    def _prepare_targets(self, jar_path: str) -> List[str]:
-        """Prepare analysis targets (extract WAR if needed)"""
-        return self._extract_war(jar_path) if jar_path.lower().endswith(".war") else [jar_path]
+        key = _cache_key("jdeps", str(self.ANALYSIS_VERSION), self.jdk.fingerprint(), _hash_file(jar_path))
+        if (cached := _disk_cache(key)) is not None:
+            print("[INFO] Using cached module analysis")
+            return cached
 
-    def _extract_war(self, war_path: str) -> List[str]:
-        """Extract WAR file to temporary directory and get analysis targets"""
+        # Extracted WAR entries must outlive the jdeps run
         with tempfile.TemporaryDirectory() as tmp_dir:
-            extract_dir = Path(tmp_dir)
-            print(f"[INFO] Extracting WAR file to temporary directory")
-
-            with zipfile.ZipFile(war_path, "r") as zf:
-                zf.extractall(extract_dir)
+            targets = self._prepare_targets(jar_path, Path(tmp_dir), archive)
+            modules = self._run_jdeps(targets)
 
-            targets = []
-            if (classes_dir := extract_dir / "WEB-INF" / "classes").exists():
-                targets.append(str(classes_dir))
-            if (lib_dir := extract_dir / "WEB-INF" / "lib").exists():
-                targets.extend(str(f) for f in lib_dir.iterdir() if f.suffix == ".jar")
+        # jdeps failed: fall back to default modules without persisting them
+        if modules is None:
+            return self.DEFAULT_MODULES
+        _disk_cache_store(key, modules)
+        return modules
 
-            return targets
+    def _prepare_targets(self, jar_path: str, tmp_dir: Path, archive: Optional[zipfile.ZipFile] = None) -> List[str]:
+        """Prepare analysis targets (extract WAR if needed)"""
+        return self._extract_war(jar_path, tmp_dir, archive) if jar_path.lower().endswith(".war") else [jar_path]
+
+    @staticmethod
+    def _is_analysis_entry(name: str, include_classes: bool = True) -> bool:
+        """Check if WAR entry is consumed by jdeps (WEB-INF/classes/**.class or WEB-INF/lib/*.jar)"""
+        # Reject traversal and Windows path syntax (backslashes, drive letters) that zipfile.extract would sanitize
+        if "\\" in name or ":" in name or ".." in name.split("/"):
+            return False
+        if name.startswith("WEB-INF/lib/"):
+            return name.endswith(".jar") and "/" not in name[len("WEB-INF/lib/"):]
+        return include_classes and name.startswith("WEB-INF/classes/") and name.endswith(".class")
+
+    @staticmethod
+    def _link_war_as_jar(war_path: str, link_dir: Path) -> Optional[str]:
+        """Expose WAR under a .jar name so jdeps reads its classes in place (jdeps only opens *.jar as archives)"""
+        link = link_dir / (Path(war_path).stem + ".jar")
+        for make_link in (os.link, os.symlink):
+            try:
+                make_link(os.path.abspath(war_path), link)
+                return str(link)
+            except OSError:
+                continue
+        return None
+
+    def _extract_entry(self, zf: zipfile.ZipFile, info: zipfile.ZipInfo, extract_dir: Path):
+        """Stream a single archive entry to disk"""
+        dst = extract_dir.joinpath(*info.filename.split("/"))
+        if extract_dir.resolve() not in dst.resolve().parents:
+            raise ValueError(f"Unsafe archive entry path: {info.filename}")
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with zf.open(info) as src_f, open(dst, "wb") as dst_f:
+            shutil.copyfileobj(src_f, dst_f, self.COPY_BUFFER_SIZE)
+
+    def _extract_parallel(self, war_path: str, entries: List[zipfile.ZipInfo], extract_dir: Path):
+        """Inflate archive entries concurrently, one ZipFile handle per worker (ZipFile is not thread-safe)"""
+        workers = min(8, os.cpu_count() or 1)
+        # Deal largest entries first round-robin to balance shards
+        entries = sorted(entries, key=lambda info: info.file_size, reverse=True)
+        shards = [entries[i::workers] for i in range(workers)]
+
+        def worker(shard: List[zipfile.ZipInfo]):
+            with zipfile.ZipFile(war_path, "r") as zf:
+                for info in shard:
+                    self._extract_entry(zf, info, extract_dir)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(worker, shards):
+                pass
+
+    def _extract_war(self, war_path: str, extract_dir: Path,
+                     archive: Optional[zipfile.ZipFile] = None) -> List[str]:
+        """Extract WAR libraries (and classes if the WAR can't be read in place) and get analysis targets"""
+        # jdeps does not descend into nested jars, but reads WEB-INF/classes straight from the archive
+        war_jar = self._link_war_as_jar(war_path, extract_dir)
+
+        # Reuse the caller's handle (and its parsed central directory) when given, without closing it
+        with nullcontext(archive) if archive else zipfile.ZipFile(war_path, "r") as zf:
+            entries = [info for info in zf.infolist()
+                       if self._is_analysis_entry(info.filename, include_classes=war_jar is None)]
+            # Nothing would be extracted anyway (classes are read in place); this only makes the case explicit
+            if war_jar and not entries:
+                print("[INFO] WAR has no WEB-INF/lib jars, analyzing it in place")
+                return [war_jar]
+
+            print("[INFO] Extracting WAR " + ("libraries" if war_jar else "classes and libraries")
+                  + " to temporary directory")
+            if sum(info.file_size for info in entries) <= self.PARALLEL_EXTRACT_THRESHOLD:
+                for info in entries:
+                    self._extract_entry(zf, info, extract_dir)
+                entries = []
+
+        if entries:
+            self._extract_parallel(war_path, entries, extract_dir)
+
+        targets = [war_jar] if war_jar else []
+        if (classes_dir := extract_dir / "WEB-INF" / "classes").exists():
+            targets.append(str(classes_dir))
+        if (lib_dir := extract_dir / "WEB-INF" / "lib").exists():
+            targets.extend(str(f) for f in lib_dir.iterdir() if f.suffix == ".jar")
+
+        return targets
+
+    @staticmethod
+    def _is_multi_release(target: str) -> bool:
+        """Check if target is a JAR with versioned entries (META-INF/versions/)"""
+        if not target.lower().endswith(".jar") or not os.path.isfile(target):
+            return False
+        try:
+            with zipfile.ZipFile(target) as zf:
+                return any(name.startswith("META-INF/versions/") for name in zf.namelist())
+        except zipfile.BadZipFile:
+            return False
 
-    def _run_jdeps(self, targets: List[str]) -> str:
-        """Run jdeps to analyze module dependencies"""
+    def _run_jdeps(self, targets: List[str]) -> Optional[str]:
+        """Run jdeps to analyze module dependencies (None if jdeps failed)"""
         jdeps_bin = self.jdk.get_bin("jdeps")
+        # Quiet mode skips diagnostics; versioned entries are resolved as the bundled JRE would load them
+        options = ["-q"]
+        if any(self._is_multi_release(target) for target in targets):
+            options += ["--multi-release", str(self.jdk.feature_version())]
         try:
             out = subprocess.check_output(
-                [str(jdeps_bin), "--print-module-deps"] + targets,
-                text=True, stderr=subprocess.DEVNULL
+                [str(jdeps_bin), "--print-module-deps"] + options + targets,
+                stderr=subprocess.DEVNULL
             )
-            return out.strip()
+            return out.decode("utf-8", "replace").strip()
         except subprocess.CalledProcessError:
             print("[INFO] Fallback to --list-deps mode")
             out = subprocess.check_output(
-                [str(jdeps_bin), "--list-deps"] + targets,
-                text=True, stderr=subprocess.DEVNULL
+                [str(jdeps_bin), "--list-deps"] + options + targets,
+                stderr=subprocess.DEVNULL
             )
-            return self._parse_list_deps(out)
+            return self._parse_list_deps(out.decode("utf-8", "replace"))
         except Exception as e:
             print(f"[WARN] jdeps execution failed: {e}, using default modules")
-            return self.DEFAULT_MODULES
+            return None
 
     def _parse_list_deps(self, output: str) -> str:
         """Parse --list-deps output to extract modules"""
-        modules = {"java.base"}
-        for line in output.splitlines():
-            if "[" in line and "]" in line:
-                modules.add(line[line.index("[") + 1:line.index("]")])
-        return ",".join(sorted(modules))
+        return ",".join(sorted({"java.base", *self.BRACKETED_RE.findall(output)}))
 
     def merge_modules(self, analyzed: str, extra: List[str]) -> str:
         """Merge analyzed modules with extra modules"""
@@ -123,24 +394,140 @@ class ModuleAnalyzer:
 class JREBuilder:
     """Minimal JRE builder using jlink"""
 
-    def __init__(self, jdk_manager: JDKManager):
+    # Reuse a cached superset JRE only if its modules weigh at most this much more than the requested ones
+    REUSE_SIZE_RATIO = 1.25
+    # jlink output is staged in CACHE_DIR under this prefix, abandoned dirs are swept after STAGING_MAX_AGE seconds
+    STAGING_PREFIX = ".staging-"
+    STAGING_MAX_AGE = 24 * 60 * 60
+
+    def __init__(self, jdk_manager: JDKManager, keep_debug: bool = False, locales: str = "en"):
         self.jdk = jdk_manager
+        self.keep_debug = keep_debug
+        self.locales = locales
+
+    def _jlink_options(self, modules: str) -> List[str]:
+        """Get jlink options shrinking the image (debug info, compression, locales)"""
+        options = ["--no-header-files", "--no-man-pages"]
+        if not self.keep_debug:
+            options.append("--strip-debug")
+        # Numeric compression levels are deprecated since JDK 21
+        options.append("--compress=zip-6" if self.jdk.feature_version() >= 21 else "--compress=2")
+        # jlink rejects --include-locales unless jdk.localedata is part of the image
+        if self.locales and "jdk.localedata" in modules.split(","):
+            options.append(f"--include-locales={self.locales}")
+        return options
 
     def build(self, output_dir: Path, modules: str):
-        """Build minimal JRE with specified modules"""
+        """Build minimal JRE with specified modules (reused from disk cache when available)"""
         print(f"[STEP] Building minimal JRE: {output_dir}")
 
+        # Everything but the module set that determines jlink output
+        env = _cache_key(self.jdk.version(), self.jdk.fingerprint(), *self._jlink_options(modules))
+        cache_entry = CACHE_DIR / f"jre-{_cache_key('jre', modules, env)}"
+
+        if (cache_entry / ".ok").exists():
+            print("[INFO] Reusing cached JRE")
+        elif superset := self._find_superset(env, modules):
+            cache_entry = superset
+            print(f"[INFO] Reusing cached JRE with a superset of the modules: {cache_entry.name}")
+        else:
+            try:
+                self._build_cached(cache_entry, modules)
+                self._index_store(cache_entry.name, env, modules)
+            except OSError as e:
+                print(f"[WARN] JRE cache unavailable ({e}), building directly")
+                self._jlink(output_dir, modules)
+                print("[OK] Minimal JRE built successfully")
+                return
+
+        _fast_copytree(cache_entry / "jre", output_dir)
+        print("[OK] Minimal JRE built successfully")
+
+    def _build_cached(self, cache_entry: Path, modules: str):
+        """Run jlink into a staging dir and publish it atomically as cache entry"""
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self._sweep_staging()
+        staging = Path(tempfile.mkdtemp(prefix=self.STAGING_PREFIX, dir=CACHE_DIR))
+        try:
+            self._jlink(staging / "jre", modules)
+            (staging / ".ok").touch()
+            try:
+                os.rename(staging, cache_entry)
+            except OSError:
+                # Published concurrently by another run
+                if not (cache_entry / ".ok").exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @classmethod
+    def _sweep_staging(cls):
+        """Remove staging dirs left behind by killed runs (old enough not to belong to a live jlink)"""
+        cutoff = time.time() - cls.STAGING_MAX_AGE
+        for staging in CACHE_DIR.glob(cls.STAGING_PREFIX + "*"):
+            try:
+                if staging.stat().st_mtime < cutoff:
+                    shutil.rmtree(staging, ignore_errors=True)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _index_load() -> dict:
+        """Load cache index mapping JRE cache entries to their build environment and modules"""
+        try:
+            return json.loads((CACHE_DIR / "index.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _index_store(entry_name: str, env: str, modules: str):
+        """Record cache entry in index (best effort, atomic replace)"""
+        index = JREBuilder._index_load()
+        index[entry_name] = {"env": env, "modules": modules.split(",")}
+        try:
+            tmp_path = CACHE_DIR / f"index.{os.getpid()}.tmp"
+            tmp_path.write_text(json.dumps(index, indent=1), encoding="utf-8")
+            os.replace(tmp_path, CACHE_DIR / "index.json")
+        except OSError as e:
+            print(f"[WARN] Failed to write cache index: {e}")
+
+    def _module_weight(self, modules) -> Optional[int]:
+        """Estimate image size of modules from their jmod file sizes, None if any size is unknown"""
+        jmods = Path(self.jdk.jdk_dir) / "jmods"
+        try:
+            return sum((jmods / f"{module}.jmod").stat().st_size for module in modules)
+        except OSError:
+            return None
+
+    def _find_superset(self, env: str, modules: str) -> Optional[Path]:
+        """Find smallest cached JRE built in the same environment whose modules cover the requested ones"""
+        requested = set(modules.split(","))
+        # Without a size estimate the ratio guard can't be enforced, so don't reuse at all
+        if not (requested_weight := self._module_weight(requested)):
+            return None
+        limit = requested_weight * self.REUSE_SIZE_RATIO
+        best, best_weight = None, None
+        for entry_name, info in self._index_load().items():
+            cached = set(info.get("modules", []))
+            if info.get("env") != env or not cached >= requested:
+                continue
+            weight = self._module_weight(cached)
+            if weight is not None and weight <= limit and (best_weight is None or weight < best_weight) \
+                    and (CACHE_DIR / entry_name / ".ok").exists():
+                best, best_weight = CACHE_DIR / entry_name, weight
+        return best
+
+    def _jlink(self, output_dir: Path, modules: str):
+        """Run jlink to create JRE at output_dir"""
         cmd = [
             str(self.jdk.get_bin("jlink")),
             "--module-path", str(Path(self.jdk.jdk_dir) / "jmods"),
             "--add-modules", modules,
             "--output", str(output_dir),
-            "--no-header-files",
-            "--no-man-pages"
+            *self._jlink_options(modules)
         ]
 
         subprocess.check_call(cmd)
-        print("[OK] Minimal JRE built successfully")
 
 
 class PackageBuilder:
@@ -151,7 +538,11 @@ import os, sys, subprocess
 from pathlib import Path
 
 def get_base():
-    return Path(sys._MEIPASS) if hasattr(sys, "_MEIPASS") else Path(__file__).parent.resolve()
+    if hasattr(sys, "_MEIPASS"):
+        # onefile bundles JRE/JAR in _MEIPASS, onedir (--fast) ships them next to the executable
+        bundled = Path(sys._MEIPASS)
+        return bundled if (bundled / "{jre_dir}").exists() else Path(sys.executable).parent
+    return Path(__file__).parent.resolve()
 
 base = get_base()
 jre = base / "{jre_dir}"
@@ -169,25 +560,103 @@ print(f"[RUN] {{java_bin}} -jar {{jar}}")
 subprocess.run([str(java_bin), "-jar", str(jar)], check=True)
 '''
 
+    NATIVE_LAUNCHER = r'''#include <limits.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#ifdef __APPLE__
+#include <mach-o/dyld.h>
+#endif
+
+int main(int argc, char **argv) {{
+    char base[PATH_MAX], java[PATH_MAX], jar[PATH_MAX];
+#ifdef __APPLE__
+    char exe[PATH_MAX];
+    uint32_t size = sizeof(exe);
+    if (_NSGetExecutablePath(exe, &size) != 0) {{ fprintf(stderr, "Executable path too long\n"); return 127; }}
+    /* May be a symlink (e.g. into PATH): resolve so jre/ is found next to the real binary */
+    if (!realpath(exe, base)) {{ perror("realpath"); return 127; }}
+#else
+    ssize_t len = readlink("/proc/self/exe", base, sizeof(base) - 1);
+    if (len < 0) {{ perror("readlink /proc/self/exe"); return 127; }}
+    base[len] = '\0';
+#endif
+    char *slash = strrchr(base, '/');
+    if (slash) *slash = '\0';
+    int n = snprintf(java, sizeof(java), "%s/%s/bin/java", base, {jre_dir});
+    if (n < 0 || (size_t)n >= sizeof(java)) {{ fprintf(stderr, "Java path too long\n"); return 127; }}
+    n = snprintf(jar, sizeof(jar), "%s/%s", base, {jar_file});
+    if (n < 0 || (size_t)n >= sizeof(jar)) {{ fprintf(stderr, "JAR path too long\n"); return 127; }}
+
+    char **args = calloc(argc + 3, sizeof(char *));
+    if (!args) {{ perror("calloc"); return 127; }}
+    args[0] = java;
+    args[1] = "-jar";
+    args[2] = jar;
+    for (int i = 1; i < argc; i++) args[i + 2] = argv[i];
+
+    execv(java, args);
+    fprintf(stderr, "Failed to run %s: ", java);
+    perror(NULL);
+    return 127;
+}}
+'''
+
+    ONEFILE_SPEC = '''# PyInstaller spec generated by jar2native
+a = Analysis(
+    [{launcher!r}],
+    datas=[({jre_path!r}, {jre_name!r}), ({jar_path!r}, ".")],
+    excludes={excludes!r},
+)
+pyz = PYZ(a.pure)
+exe = EXE(
+    pyz, a.scripts, a.binaries, a.datas, [],
+    name={output!r},
+    strip={strip!r},
+    upx=False,
+    console=True,
+    # JRE and JAR payloads (DATA) are already compressed, store them as-is
+    cdict={{"EXTENSION": True, "BINARY": True, "EXECUTABLE": True, "PYSOURCE": True,
+           "PYMODULE": True, "SPLASH": True, "DATA": False}},
+)
+'''
+
+    EXCLUDED_MODULES = ["tkinter", "unittest"]
+
+    DIST_DIR = Path("dist")
+
     def __init__(self, work_dir: Path):
         self.work_dir = work_dir
         self.work_dir.mkdir(exist_ok=True)
 
+    @staticmethod
+    def _link_or_copy(src: Path, dst: Path):
+        """Hard link file, copy when linking is impossible (cross-device, ACLs)"""
+        try:
+            os.link(src, dst)
+        except FileExistsError:
+            os.unlink(dst)
+            PackageBuilder._link_or_copy(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
     def prepare(self, jar_path: Path, jre_dir: Path) -> Path:
         """Prepare source files (JAR, JRE, launcher) for packaging"""
         src_dir = self.work_dir / "src"
         src_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy JAR file
-        shutil.copy2(jar_path, src_dir / jar_path.name)
+        # Stage JAR file (read-only for PyInstaller, so a hard link suffices)
+        self._link_or_copy(jar_path, src_dir / jar_path.name)
 
-        # Copy JRE directory (support symlinks and handle conflicts)
+        # Stage JRE directory (read-only for PyInstaller, so hard links suffice; handle conflicts)
         jre_dest = src_dir / jre_dir.name
         try:
-            shutil.copytree(jre_dir, jre_dest, symlinks=True)
+            _fast_copytree(jre_dir, jre_dest)
         except FileExistsError:
             shutil.rmtree(jre_dest, ignore_errors=True)
-            shutil.copytree(jre_dir, jre_dest, symlinks=True)
+            _fast_copytree(jre_dir, jre_dest)
         except PermissionError as e:
             raise RuntimeError(f"Permission denied while copying JRE: {e}")
 
@@ -200,8 +669,8 @@ subprocess.run([str(java_bin), "-jar", str(jar)], check=True)
 
         return launcher_path
 
-    def build_exe(self, launcher: Path, output: str, jre_name: str, jar_name: str):
-        """Build executable using PyInstaller"""
+    def build_exe(self, launcher: Path, output: str, jre_name: str, jar_name: str, onedir: bool = False) -> Path:
+        """Build executable using PyInstaller, return path of the build output"""
         try:
             import PyInstaller.__main__
         except ImportError:
@@ -213,19 +682,93 @@ subprocess.run([str(java_bin), "-jar", str(jar)], check=True)
         jre_path = launcher.parent / jre_name
         jar_path = launcher.parent / jar_name
 
-        # PyInstaller arguments
-        pyinstaller_args = [
-            "--onefile",
-            "--name", output,
-            str(launcher),
-            "--add-data", f"{jre_path}{os.pathsep}{jre_name}",
-            "--add-data", f"{jar_path}{os.pathsep}.",
-            "--clean"
-        ]
+        if onedir:
+            # JRE and JAR are linked next to the executable after the build instead of being bundled
+            pyinstaller_args = [
+                "--onedir",
+                "--noconfirm",
+                "--name", output,
+                str(launcher),
+                "--noupx",
+                "--clean"
+            ]
+            for module in self.EXCLUDED_MODULES:
+                pyinstaller_args += ["--exclude-module", module]
+            if os.name != "nt":
+                pyinstaller_args.append("--strip")
+        else:
+            # Payload compression can only be disabled from a spec file
+            spec_path = launcher.parent / f"{output}.spec"
+            spec_path.write_text(
+                self.ONEFILE_SPEC.format(
+                    launcher=str(launcher), jre_path=str(jre_path), jre_name=jre_name, jar_path=str(jar_path),
+                    excludes=self.EXCLUDED_MODULES, output=output, strip=os.name != "nt"
+                ),
+                encoding="utf-8"
+            )
+            pyinstaller_args = [str(spec_path), "--clean"]
 
         # Run PyInstaller
         PyInstaller.__main__.run(pyinstaller_args)
 
+        dist_dir = self.DIST_DIR / output
+        if onedir:
+            self._ship_payload(dist_dir, jre_path, jar_path)
+        return dist_dir
+
+    def build_native(self, launcher: Path, output: str, jre_name: str, jar_name: str) -> Optional[Path]:
+        """Build C launcher with JRE/JAR alongside (Linux/macOS with cc only), return None when unavailable"""
+        # The launcher locates itself via /proc/self/exe (Linux) or _NSGetExecutablePath (macOS) only
+        supported = sys.platform.startswith("linux") or sys.platform == "darwin"
+        cc = shutil.which("cc") if supported else None
+        if not cc:
+            return None
+
+        print(f"[STEP] Building native launcher: {output}")
+
+        source = launcher.parent / "launcher.c"
+        source.write_text(
+            self.NATIVE_LAUNCHER.format(jre_dir=self._c_string(jre_name), jar_file=self._c_string(jar_name)),
+            encoding="utf-8"
+        )
+
+        dist_dir = self.DIST_DIR / output
+        if dist_dir.is_dir():
+            shutil.rmtree(dist_dir)
+        elif dist_dir.exists():
+            dist_dir.unlink()
+        dist_dir.mkdir(parents=True)
+
+        cmd = [cc, "-O2", "-o", str(dist_dir / output), str(source)]
+        if sys.platform != "darwin":
+            cmd.insert(2, "-s")
+        try:
+            subprocess.check_call(cmd)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"[WARN] Native launcher build failed ({e}), falling back to PyInstaller")
+            return None
+
+        self._ship_payload(dist_dir, launcher.parent / jre_name, launcher.parent / jar_name)
+        return dist_dir
+
+    @staticmethod
+    def _c_string(value: str) -> str:
+        """Quote value as C string literal"""
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    def _ship_payload(self, dist_dir: Path, jre_path: Path, jar_path: Path):
+        """Place JRE and JAR next to the executable in dist_dir"""
+        # The deliverable must own its files: hard links would share inodes with the JRE cache and input JAR
+        jre_dest = dist_dir / jre_path.name
+        try:
+            _clone_tree(jre_path, jre_dest)
+        except FileExistsError:
+            raise
+        except OSError:
+            shutil.rmtree(jre_dest, ignore_errors=True)
+            _parallel_copytree(jre_path, jre_dest)
+        shutil.copy2(jar_path, dist_dir / jar_path.name)
+
 
 class JavaPackager:
     """Main packaging orchestrator"""
@@ -235,7 +778,9 @@ class JavaPackager:
         self.jar_path = Path(args.jar_file).resolve()
         self.jdk = JDKManager(args.jdk_path)
         self.analyzer = ModuleAnalyzer(self.jdk)
-        self.jre_builder = JREBuilder(self.jdk)
+        self.jre_builder = JREBuilder(self.jdk, keep_debug=args.keep_debug, locales=args.locales)
+        # Input archive, opened once in validate() and shared by all readers
+        self._zip: Optional[zipfile.ZipFile] = None
 
     def validate(self):
         """Validate input file and prerequisites"""
@@ -245,21 +790,28 @@ class JavaPackager:
         if self.jar_path.suffix.lower() not in ['.jar', '.war']:
             raise ValueError("Only JAR and WAR files are supported")
 
+        try:
+            self._zip = zipfile.ZipFile(self.jar_path)
+        except zipfile.BadZipFile:
+            raise ValueError(f"Input file is not a valid JAR/WAR archive: {self.jar_path}")
+
         if self.jar_path.suffix.lower() == '.jar' and not self._has_main_class():
             raise ValueError("JAR file missing Main-Class attribute in MANIFEST.MF")
 
     def _has_main_class(self) -> bool:
         """Check if JAR has Main-Class attribute"""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_dir = Path(tmp_dir)
-            # Extract MANIFEST.MF
-            subprocess.run(
-                [str(self.jdk.get_bin("jar")), "xf", str(self.jar_path), "META-INF/MANIFEST.MF"],
-                cwd=tmp_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-            )
-
-            mf_path = tmp_dir / "META-INF" / "MANIFEST.MF"
-            return mf_path.exists() and "Main-Class" in mf_path.read_text(encoding="utf-8", errors="ignore")
+        marker = b"Main-Class:"
+        try:
+            with self._zip.open("META-INF/MANIFEST.MF") as mf:
+                # Inflate in chunks and stop at the attribute (keep a tail so a split marker still matches)
+                buf = b""
+                while chunk := mf.read(4096):
+                    buf = buf[-(len(marker) - 1):] + chunk
+                    if marker in buf:
+                        return True
+                return False
+        except (KeyError, zipfile.BadZipFile):
+            return False
 
     def package(self):
         """Main packaging workflow"""
@@ -272,7 +824,7 @@ class JavaPackager:
                 self.validate()
 
                 print("[STEP] Analyzing module dependencies")
-                analyzed_modules = self.analyzer.analyze(str(self.jar_path), self.args.all_modules)
+                analyzed_modules = self.analyzer.analyze(str(self.jar_path), self.args.all_modules, self._zip)
                 final_modules = self.analyzer.merge_modules(analyzed_modules, self.args.extra_modules or [])
                 print(f"[INFO] Final modules: {final_modules}")
 
@@ -285,16 +837,29 @@ class JavaPackager:
                 launcher_script = builder.prepare(self.jar_path, jre_dir)
 
                 # Build executable
-                output_name = self.jar_path.stem + (".exe" if os.name == "nt" else "")
-                builder.build_exe(launcher_script, output_name, jre_dir.name, self.jar_path.name)
+                # onedir (--fast) uses the name for dist/<name>/ as-is, PyInstaller adds .exe to the executable
+                output_name = self.jar_path.stem
+                if os.name == "nt" and not self.args.fast:
+                    output_name += ".exe"
+                output_path = None
+                if self.args.fast:
+                    output_path = builder.build_native(launcher_script, output_name, jre_dir.name,
+                                                       self.jar_path.name)
+                if output_path is None:
+                    output_path = builder.build_exe(launcher_script, output_name, jre_dir.name, self.jar_path.name,
+                                                    onedir=self.args.fast)
 
                 # Calculate and print elapsed time
                 elapsed_time = time.time() - start_time
-                print(f"✅ Packaging completed in {elapsed_time:.2f}s: dist/{output_name}")
+                print(f"✅ Packaging completed in {elapsed_time:.2f}s: {output_path.as_posix()}")
 
             except Exception as e:
                 print(f"[ERROR] Packaging failed: {e}")
                 raise
+            finally:
+                if self._zip:
+                    self._zip.close()
+                    self._zip = None
 
 
 def main():
@@ -304,6 +869,11 @@ def main():
     parser.add_argument("--jdk-path", help="Custom JDK installation path (optional)")
     parser.add_argument("--extra-modules", nargs="+", help="Additional modules to include (optional)")
     parser.add_argument("--all-modules", action="store_true", help="Include all JDK modules (optional)")
+    parser.add_argument("--keep-debug", action="store_true", help="Keep debug info in the JRE (optional)")
+    parser.add_argument("--locales", default="en",
+                        help="Locales to keep when jdk.localedata is included, empty keeps all (default: en)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Build a directory with JRE/JAR next to the executable instead of a single file (optional)")
 
     args = parser.parse_args()
 